@@ -3,9 +3,51 @@ import os  # для работы с операционной системой (
 import shlex  # для корректного разбиения командной строки с учетом кавычек
 import socket  # для получения информации о сетевых параметрах (имя хоста)
 import argparse  # для парсинга аргументов командной строки
-import sys  # для работы с системными параметрами (не используется явно, но может потребоваться)
+import sys  # для пакетного вывода результатов команд через sys.stdout
 import json  # для работы с JSON-файлами VFS
+import re  # для быстрого разбиения простых командных строк
 import base64  # для декодирования base64 данных
+import getpass  # для получения имени пользователя, если os.getlogin недоступен
+from functools import lru_cache  # для кэширования результатов разбора путей
+
+# orjson (если установлен) разбирает JSON заметно быстрее стандартного модуля.
+# Зависимость необязательная: без нее используется json.loads
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Имя пользователя и хоста определяются один раз при загрузке модуля.
+# os.getlogin не работает без управляющего терминала, поэтому есть запасной вариант
+try:
+    _USERNAME = os.getlogin()
+except OSError:
+    _USERNAME = getpass.getuser()
+_HOSTNAME = socket.gethostname()
+
+
+@lru_cache(maxsize=4096)
+def _split_path(path):
+    """
+    Разбивает путь на непустые компоненты. Результат - кортеж, поэтому его
+    можно безопасно кэшировать и использовать как ключ словаря
+    """
+    return tuple(p for p in path.split('/') if p)
+
+
+# Пробельные символы, по которым разбивает строку shlex (str.split дополнительно
+# делит по NBSP, \x0b, \x0c и другим Unicode-пробелам, что дало бы иной результат)
+_SHLEX_WHITESPACE = re.compile(r'[ \t\r\n]+')
+
+
+@lru_cache(maxsize=512)
+def _shlex_split(command_line):
+    """
+    Разбивает строку команды с помощью shlex. Повторяющиеся строки
+    (например, в скриптах) разбираются только один раз
+    """
+    return tuple(shlex.split(command_line))
 
 class VFS:
     """
@@ -23,6 +65,7 @@ class VFS:
         self.vfs_path = vfs_path
         self.file_system = {}  # Словарь для хранения структуры файловой системы
         self.current_vfs_path = "/"  # Текущий путь в VFS
+        self._nodes = {}  # Плоский индекс узлов: абсолютный путь -> узел
         
         if vfs_path and os.path.exists(vfs_path):
             self.load_vfs(vfs_path)
@@ -35,8 +78,10 @@ class VFS:
         Загружает VFS из JSON-файла
         """
         try:
-            with open(vfs_path, 'r', encoding='utf-8') as f:
-                self.file_system = json.load(f)
+            # Читаем файл целиком и разбираем за один вызов
+            with open(vfs_path, 'rb') as f:
+                self.file_system = _json_loads(f.read())
+            self._build_index()
             print(f"VFS загружена из {vfs_path}")
         except Exception as e:
             print(f"Ошибка загрузки VFS: {e}")
@@ -74,53 +119,118 @@ class VFS:
                 }
             }
         }
+        self._build_index()
         print("Создана VFS по умолчанию")
     
-    def decode_content(self, content):
+    def _invalidate(self):
         """
-        Декодирует содержимое файла из base64 если необходимо
+        Полностью перестраивает индекс узлов. Нужен после изменений, затрагивающих
+        целое поддерево (например, замены директории); добавление или замена одного
+        файла обновляет индекс точечно
         """
-        if isinstance(content, str) and content.startswith('base64:'):
+        self._build_index()
+    
+    def _build_index(self):
+        """
+        Один раз обходит вложенную структуру VFS и строит плоский индекс
+        self._nodes (абсолютный путь -> узел). Файловым узлам, у которых еще нет
+        статистики, проставляются размер, число строк и слов
+        """
+        nodes = {}
+        root = self.file_system.get("/")
+        # Обход в глубину с явным стеком (путь, узел)
+        stack = [("/", root)] if root is not None else []
+        
+        while stack:
+            path, node = stack.pop()
+            nodes[path] = node
+            if node.get('type') == 'file':
+                if '_size' not in node:
+                    self._annotate_file(node)
+            elif node.get('type') == 'directory':
+                base = path if path != "/" else ""
+                for name, item in node.get('content', {}).items():
+                    stack.append((base + '/' + name, item))
+        
+        self._nodes = nodes
+    
+    def _annotate_file(self, node):
+        """
+        Сохраняет в файловом узле статистику содержимого (_size, _lines, _words).
+        Заодно отмечает base64-файлы флагом _is_b64 и убирает из содержимого
+        префикс 'base64:', чтобы не проверять его при каждом чтении
+        """
+        if '_is_b64' not in node:
+            raw = node.get('content', '')
+            is_b64 = isinstance(raw, str) and raw.startswith('base64:')
+            node['_is_b64'] = is_b64
+            if is_b64:
+                node['content'] = raw[7:]  # Убираем префикс 'base64:'
+        
+        content = self._decode_node(node)
+        lines = content.splitlines()
+        node['_size'] = len(content.encode('utf-8'))
+        node['_lines'] = len(lines)
+        node['_words'] = sum(len(line.split()) for line in lines)
+    
+    def decode_content(self, node):
+        """
+        Декодирует содержимое файлового узла из base64, если узел отмечен флагом _is_b64
+        """
+        content = node.get('content', '')
+        if node.get('_is_b64'):
             try:
-                base64_data = content[7:]  # Убираем префикс 'base64:'
-                decoded = base64.b64decode(base64_data).decode('utf-8')
-                return decoded
+                return base64.b64decode(content).decode('utf-8')
             except Exception as e:
                 return f"Ошибка декодирования: {e}"
+        # Содержимое файла в JSON может оказаться не строкой (число, null и т.п.) -
+        # приводим его к тексту, чтобы один такой файл не ломал загрузку всей VFS
+        if not isinstance(content, str):
+            content = '' if content is None else str(content)
         return content
     
+    def _decode_node(self, node):
+        """
+        Возвращает декодированное содержимое файлового узла.
+        Результат сохраняется в самом узле, чтобы не декодировать base64 повторно
+        """
+        decoded = node.get('_decoded')
+        if decoded is None:
+            decoded = self.decode_content(node)
+            node['_decoded'] = decoded
+        return decoded
+    
     def get_path_parts(self, path):
         """
         Разбивает путь на части, обрабатывая относительные пути и символы . и ..
+        
+        Returns:
+            tuple: ('/', компоненты абсолютного пути...)
         """
+        new_parts = _split_path(path)
+        
+        # Абсолютный путь начинается от корня, относительный - от текущего пути
         if path.startswith('/'):
-            # Абсолютный путь
-            parts = [p for p in path.split('/') if p]
-            parts.insert(0, '/')
+            base_parts = ()
         else:
-            # Относительный путь - начинаем с текущего
-            current_parts = [p for p in self.current_vfs_path.split('/') if p]
-            if current_parts and current_parts[0] == '':
-                current_parts = current_parts[1:]
-            
-            new_parts = [p for p in path.split('/') if p]
-            
-            # Обрабатываем . и ..
-            result_parts = []
-            for part in new_parts:
-                if part == '.':
-                    continue
-                elif part == '..':
-                    if result_parts:
-                        result_parts.pop()
-                    elif current_parts:
-                        current_parts.pop()
-                else:
-                    result_parts.append(part)
-            
-            parts = ['/'] + current_parts + result_parts
+            base_parts = _split_path(self.current_vfs_path)
+        
+        # Быстрый путь: если нет . и .., достаточно склеить готовые кортежи
+        if '.' not in new_parts and '..' not in new_parts:
+            return ('/',) + base_parts + new_parts
+        
+        # Обрабатываем . и .. в одном списке
+        parts = list(base_parts)
+        for part in new_parts:
+            if part == '.':
+                continue
+            elif part == '..':
+                if parts:
+                    parts.pop()
+            else:
+                parts.append(part)
         
-        return parts
+        return ('/',) + tuple(parts)
     
     def resolve_path(self, path):
         """
@@ -129,67 +239,44 @@ class VFS:
         parts = self.get_path_parts(path)
         return '/' + '/'.join(parts[1:]) if len(parts) > 1 else '/'
 
+    def resolve_and_lookup(self, path):
+        """
+        Преобразует путь в абсолютный и сразу находит соответствующий узел,
+        разбирая путь только один раз
+        
+        Returns:
+            tuple: (абсолютный путь, узел или None если путь не существует)
+        """
+        parts = self.get_path_parts(path)
+        abs_path = '/' + '/'.join(parts[1:]) if len(parts) > 1 else '/'
+        return abs_path, self._nodes.get(abs_path)
+
     def path_exists(self, path):
         """
         Проверяет существование пути в VFS
         """
-        if path == "/":
-            return True
-        
-        parts = [p for p in path.split('/') if p]  # Убираем пустые элементы
-        current = self.file_system.get("/", {})
-        
-        for part in parts:
-            content = current.get('content', {})
-            if part not in content:
-                return False
-            current = content[part]
-        
-        return True
+        return self.get_node(path) is not None
 
     def get_directory_listing(self, path):
         """
         Получает список содержимого директории
         """
-        if not self.path_exists(path):
-            return None
-        
-        if path == "/":
-            content = self.file_system.get("/", {}).get('content', {})
-            return list(content.keys())
-        
-        parts = [p for p in path.split('/') if p]
-        current = self.file_system.get("/", {})
-        
-        for part in parts:
-            content = current.get('content', {})
-            current = content[part]
-        
-        if current.get('type') != 'directory':
+        node = self.get_node(path)
+        if node is None or node.get('type') != 'directory':
             return None
         
-        return list(current.get('content', {}).keys())
+        return list(node.get('content', {}).keys())
 
     def get_node(self, path):
         """
-        Получает узел VFS по указанному пути
+        Получает узел VFS по указанному пути через плоский индекс
         """
-        if not self.path_exists(path):
-            return None
-        
-        if path == "/":
-            return self.file_system.get("/")
-        
-        parts = [p for p in path.split('/') if p]
-        current = self.file_system.get("/", {})
-        
-        for part in parts:
-            content = current.get('content', {})
-            if part not in content:
-                return None
-            current = content[part]
-        
-        return current
+        node = self._nodes.get(path)
+        if node is None:
+            # Путь может быть записан не в каноническом виде (без ведущего '/',
+            # с повторными или завершающими '/')
+            node = self._nodes.get('/' + '/'.join(_split_path(path)))
+        return node
 
     def get_parent_node(self, path):
         """
@@ -198,7 +285,7 @@ class VFS:
         if path == "/":
             return None
         
-        parts = [p for p in path.split('/') if p]
+        parts = _split_path(path)
         if len(parts) == 1:
             return self.file_system.get("/")
         
@@ -209,100 +296,112 @@ class VFS:
         """
         Читает содержимое файла из VFS
         """
-        node = self.get_node(path)
+        return self.read_node(self.get_node(path))
+
+    def read_node(self, node):
+        """
+        Читает содержимое уже найденного файлового узла
+        """
         if node is None or node.get('type') != 'file':
             return None
         
-        content = node.get('content', '')
-        return self.decode_content(content)
+        return self._decode_node(node)
 
     def get_file_size(self, path):
         """
         Получает размер файла в VFS
         """
-        content = self.read_file(path)
-        if content is None:
+        node = self.get_node(path)
+        if node is None or node.get('type') != 'file':
             return None
-        return len(content.encode('utf-8'))
+        return node['_size']
 
     def count_file_stats(self, path):
         """
         Подсчитывает статистику файла (строки, слова, байты)
         """
-        content = self.read_file(path)
-        if content is None:
+        return self.count_node_stats(self.get_node(path))
+
+    def count_node_stats(self, node):
+        """
+        Возвращает статистику уже найденного файлового узла (строки, слова, байты)
+        """
+        if node is None or node.get('type') != 'file':
             return None, None, None
         
-        lines = content.splitlines()
-        line_count = len(lines)
-        word_count = sum(len(line.split()) for line in lines)
-        byte_count = len(content.encode('utf-8'))
-        
-        return line_count, word_count, byte_count
+        return node['_lines'], node['_words'], node['_size']
 
     def get_directory_size(self, path):
         """
         Рекурсивно вычисляет общий размер всех файлов в директории
         """
-        if not self.path_exists(path):
+        return self.get_node_size(self.get_node(path))
+
+    def get_node_size(self, node):
+        """
+        Вычисляет общий размер всех файлов в уже найденном узле-директории
+        """
+        if node is None or node.get('type') != 'directory':
             return None
         
+        return self._size_of_node(node)
+
+    def _size_of_node(self, node):
+        """
+        Вычисляет размер узла за один проход по поддереву, без повторного поиска путей.
+        Обход выполняется с явным стеком, поэтому глубина VFS не ограничена
+        лимитом рекурсии
+        """
         total_size = 0
+        stack = [node]
         
-        if path == "/":
-            content = self.file_system.get("/", {}).get('content', {})
-        else:
-            node = self.get_node(path)
-            if node.get('type') != 'directory':
-                return None
-            content = node.get('content', {})
-        
-        for name, item in content.items():
-            item_path = path + '/' + name if path != '/' else '/' + name
-            if item.get('type') == 'file':
-                file_size = self.get_file_size(item_path)
-                if file_size is not None:
-                    total_size += file_size
-            elif item.get('type') == 'directory':
-                dir_size = self.get_directory_size(item_path)
-                if dir_size is not None:
-                    total_size += dir_size
+        while stack:
+            node = stack.pop()
+            if node.get('type') == 'file':
+                total_size += node['_size']
+            elif node.get('type') == 'directory':
+                stack.extend(node.get('content', {}).values())
         
         return total_size
 
-    def get_tree_structure(self, path, prefix="", is_last=True, is_root=True):
+    def get_tree_structure(self, path):
         """
-        Рекурсивно строит древовидную структуру директории
+        Строит древовидную структуру директории
         """
-        if not self.path_exists(path):
-            return None
-        
-        node = self.get_node(path)
-        if node.get('type') != 'directory':
+        return self.get_node_tree(self.get_node(path), path)
+
+    def get_node_tree(self, node, name):
+        """
+        Строит древовидную структуру уже найденного узла-директории,
+        подписывая корень дерева строкой name
+        """
+        if node is None or node.get('type') != 'directory':
             return None
         
-        if is_root:
-            result = path + "\n"
-        else:
-            result = prefix + ("└── " if is_last else "├── ") + os.path.basename(path) + "\n"
-        
-        content = node.get('content', {})
-        items = list(content.items())
+        out = []
+        # Обход в глубину с явным стеком (узел, имя, отступ, последний ли, корень ли).
+        # Дочерние элементы кладутся в обратном порядке, чтобы извлекаться по порядку
+        stack = [(node, name, "", True, True)]
         
-        for i, (name, item) in enumerate(items):
-            item_path = path + '/' + name if path != '/' else '/' + name
-            is_last_item = i == len(items) - 1
-            
-            if item.get('type') == 'directory':
-                new_prefix = prefix + ("    " if is_last else "│   ")
-                subtree = self.get_tree_structure(item_path, new_prefix, is_last_item, False)
-                if subtree:
-                    result += subtree
+        while stack:
+            node, name, prefix, is_last, is_root = stack.pop()
+            if is_root:
+                out.append(name + "\n")
             else:
-                result += prefix + ("    " if is_last else "│   ")
-                result += ("└── " if is_last_item else "├── ") + name + "\n"
+                out.append(prefix + ("└── " if is_last else "├── ") + name + "\n")
+            
+            if node.get('type') != 'directory':
+                continue
+            
+            child_prefix = prefix + ("    " if is_last else "│   ")
+            items = list(node.get('content', {}).items())
+            last_index = len(items) - 1
+            
+            for i in range(last_index, -1, -1):
+                item_name, item = items[i]
+                stack.append((item, item_name, child_prefix, i == last_index, False))
         
-        return result
+        return ''.join(out)
 
     def copy_file(self, src_path, dst_path):
         """
@@ -313,19 +412,33 @@ class VFS:
             return False, "Исходный файл не существует или не является файлом"
         
         # Получаем родительскую директорию для dst_path
-        dst_parts = [p for p in dst_path.split('/') if p]
+        dst_parts = _split_path(dst_path)
         dst_parent_path = '/' + '/'.join(dst_parts[:-1]) if len(dst_parts) > 1 else '/'
         dst_name = dst_parts[-1] if dst_parts else ""
         
+        if not dst_name:
+            return False, "Не указано имя целевого файла"
+        
         dst_parent = self.get_node(dst_parent_path)
         if dst_parent is None or dst_parent.get('type') != 'directory':
             return False, "Целевая директория не существует"
         
         # Копируем содержимое файла
-        dst_parent['content'][dst_name] = {
+        dst_node = {
             "type": "file",
-            "content": src_node.get('content', '')
+            "content": src_node.get('content', ''),
+            "_is_b64": src_node.get('_is_b64', False)
         }
+        self._annotate_file(dst_node)
+        replaced = dst_parent['content'].get(dst_name)
+        dst_parent['content'][dst_name] = dst_node
+        
+        # Обновляем индекс: при замене директории в нем остались бы пути ее
+        # поддерева, поэтому перестраиваем его целиком, иначе меняем одну запись
+        if replaced is not None and replaced.get('type') == 'directory':
+            self._invalidate()
+        else:
+            self._nodes['/' + '/'.join(dst_parts)] = dst_node
         
         return True, "Файл успешно скопирован"
 
@@ -345,10 +458,10 @@ class ShellEmulator:
         """
         
         # Получаем имя текущего пользователя ОС для отображения в приглашении
-        self.username = os.getlogin()
+        self.username = _USERNAME
         
         # Получаем сетевое имя компьютера для отображения в приглашении
-        self.hostname = socket.gethostname()
+        self.hostname = _HOSTNAME
         
         # Получаем текущую рабочую директорию для отображения в приглашении
         self.current_dir = os.getcwd()
@@ -356,10 +469,30 @@ class ShellEmulator:
         # Флаг работы эмулятора. Когда становится False - программа завершается
         self.running = True
         
+        # Кэш приглашения: (путь VFS, для которого оно сформировано, строка приглашения)
+        self._prompt_cache = (None, None)
+        
+        # Кэш разобранных скриптов: (путь, время изменения) -> список разобранных строк
+        self._script_cache = {}
+        
         # Инициализируем VFS
         self.vfs = VFS(vfs_path)
         self.startup_script = startup_script
         
+        # Таблица команд: имя команды -> метод-обработчик
+        self._dispatch = {
+            "exit": self._cmd_exit,
+            "ls": self._cmd_ls,
+            "cd": self._cmd_cd,
+            "cat": self._cmd_cat,
+            "pwd": self._cmd_pwd,
+            "echo": self._cmd_echo,
+            "wc": self._cmd_wc,
+            "du": self._cmd_du,
+            "tree": self._cmd_tree,
+            "cp": self._cmd_cp,
+        }
+        
         # Выводим отладочную информацию о конфигурации эмулятора
         print("КОНФИГУРАЦИЯ ЭМУЛЯТОРА")
         # Выводим путь к VFS или сообщение, что путь не указан
@@ -379,13 +512,21 @@ class ShellEmulator:
         
         # Используем VFS путь вместо реального пути ОС
         vfs_dir = self.vfs.current_vfs_path
+        
+        # Если директория не менялась - возвращаем ранее сформированное приглашение
+        cached_dir, cached_prompt = self._prompt_cache
+        if vfs_dir == cached_dir:
+            return cached_prompt
+        
         if vfs_dir == "/":
             dir_name = "/"
         else:
-            dir_name = os.path.basename(vfs_dir) if vfs_dir != "/" else "/"
+            dir_name = os.path.basename(vfs_dir)
         
-        # Формируем и возвращаем строку приглашения
-        return f"{self.username}@{self.hostname}:{dir_name}$ "
+        # Формируем, запоминаем и возвращаем строку приглашения
+        prompt = f"{self.username}@{self.hostname}:{dir_name}$ "
+        self._prompt_cache = (vfs_dir, prompt)
+        return prompt
     
     def parse_command(self, command_line):
         """
@@ -400,144 +541,164 @@ class ShellEmulator:
         """
         
         try:
-            # Используем shlex.split для корректного разбиения строки
-            # Этот метод правильно обрабатывает кавычки и экранирование
-            parts = shlex.split(command_line)
-            
-            # Если после разбиения получили пустой список (пользователь ввел пустую строку)
-            if not parts:
-                return None, []  # Возвращаем None и пустой список аргументов
-            
-            # Первый элемент - это имя команды
-            command = parts[0]
-            # Все остальные элементы - это аргументы команды
-            args = parts[1:]
-            
-            return command, args
+            return self._split_command(command_line)
             
         except ValueError as e:
             # Обрабатываем ошибки парсинга (например, незакрытые кавычки)
             print(f"Ошибка парсинга: {e}")
             return None, []  # Возвращаем None и пустой список при ошибке
     
-    def execute_command(self, command, args):
+    def _split_command(self, command_line):
         """
-        Выполняет команду эмулятора.
+        Разбивает строку команды на имя команды и аргументы.
+        В отличие от parse_command не печатает ошибку, а выбрасывает ValueError
         """
         
-        # Проверяем команду exit - завершение работы эмулятора
-        if command == "exit":
-            # Устанавливаем флаг работы в False для остановки основного цикла
-            self.running = False
-            print("Выход из эмулятора")
-        
-        # Обрабатываем команду ls (list directory) - теперь работает с VFS
-        elif command == "ls":
-            target_path = args[0] if args else self.vfs.current_vfs_path
-            
-            listing = self.vfs.get_directory_listing(target_path)
-            if listing is not None:
-                for item in listing:
-                    print(item)
-            else:
-                print(f"ls: невозможно получить доступ к '{target_path}': Нет такого файла или каталога")
-        
-        # Обрабатываем команду cd (change directory) - теперь работает с VFS
-        elif command == "cd":
-            if not args:
-                # cd без аргументов - переход в корень VFS
-                self.vfs.current_vfs_path = "/"
-            else:
-                target_path = args[0]
-                new_path = self.vfs.resolve_path(target_path)
-                
-                if self.vfs.path_exists(new_path):
-                    # Получаем узел по пути
-                    node = self.vfs.get_node(new_path)
-                    if node.get('type') == 'directory':
-                        self.vfs.current_vfs_path = new_path
-                    else:
-                        print(f"cd: {target_path}: Не каталог")
-                else:
-                    print(f"cd: {target_path}: Нет такого файла или каталога")
-        
-        # Новая команда cat для чтения файлов из VFS
-        elif command == "cat":
-            if not args:
-                print("cat: отсутствует операнд")
-                return
-            
-            for file_path in args:
-                content = self.vfs.read_file(self.vfs.resolve_path(file_path))
-                if content is not None:
-                    print(content)
-                else:
-                    print(f"cat: {file_path}: Нет такого файла или каталога")
-        
-        # Новая команда pwd для показа текущего пути в VFS
-        elif command == "pwd":
-            print(self.vfs.current_vfs_path)
+        if '"' not in command_line and "'" not in command_line and '\\' not in command_line:
+            # Без кавычек и экранирования достаточно простого разбиения по тем же
+            # пробельным символам, что использует shlex
+            parts = [p for p in _SHLEX_WHITESPACE.split(command_line) if p]
+        else:
+            # Используем shlex.split для корректного разбиения строки
+            # Этот метод правильно обрабатывает кавычки и экранирование
+            parts = _shlex_split(command_line)
         
-        # Команда echo для демонстрации работы с аргументами
-        elif command == "echo":
-            print(f"echo: {' '.join(args)}")
+        # Если после разбиения получили пустой список (пользователь ввел пустую строку)
+        if not parts:
+            return None, []  # Возвращаем None и пустой список аргументов
         
-        # Новая команда wc для подсчета строк, слов и байтов
-        elif command == "wc":
-            if not args:
-                print("wc: отсутствует операнд")
-                return
-            
-            for file_path in args:
-                line_count, word_count, byte_count = self.vfs.count_file_stats(self.vfs.resolve_path(file_path))
-                if line_count is not None:
-                    print(f"  {line_count}  {word_count}  {byte_count} {file_path}")
-                else:
-                    print(f"wc: {file_path}: Нет такого файла или каталога")
+        # Первый элемент - это имя команды, все остальные - аргументы команды
+        return parts[0], list(parts[1:])
+    
+    def execute_command(self, command, args):
+        """
+        Выполняет команду эмулятора.
+        Обработчик команды выбирается по имени из таблицы self._dispatch
+        """
         
-        # Новая команда du для показа размера файлов и директорий
-        elif command == "du":
-            if not args:
-                # Если аргументов нет, показываем размер текущей директории
-                target_path = self.vfs.current_vfs_path
-            else:
-                target_path = self.vfs.resolve_path(args[0])
+        handler = self._dispatch.get(command)
+        if handler is not None:
+            handler(args)
+        # Обрабатываем неизвестные команды
+        elif command:
+            print(f"Команда '{command}' не найдена")
+    
+    def _cmd_exit(self, args):
+        """Команда exit - завершение работы эмулятора"""
+        # Устанавливаем флаг работы в False для остановки основного цикла
+        self.running = False
+        print("Выход из эмулятора")
+    
+    def _cmd_ls(self, args):
+        """Команда ls (list directory) - список содержимого директории VFS"""
+        target_path = args[0] if args else self.vfs.current_vfs_path
+        
+        listing = self.vfs.get_directory_listing(target_path)
+        if listing is not None:
+            # Выводим весь список одной операцией записи
+            if listing:
+                sys.stdout.write("\n".join(listing) + "\n")
+        else:
+            print(f"ls: невозможно получить доступ к '{target_path}': Нет такого файла или каталога")
+    
+    def _cmd_cd(self, args):
+        """Команда cd (change directory) - смена текущей директории VFS"""
+        if not args:
+            # cd без аргументов - переход в корень VFS
+            self.vfs.current_vfs_path = "/"
+        else:
+            target_path = args[0]
+            # Получаем абсолютный путь и узел по нему за один поиск
+            new_path, node = self.vfs.resolve_and_lookup(target_path)
             
-            size = self.vfs.get_directory_size(target_path)
-            if size is not None:
-                print(f"{size}\t{target_path}")
+            if node is None:
+                print(f"cd: {target_path}: Нет такого файла или каталога")
+            elif node.get('type') == 'directory':
+                self.vfs.current_vfs_path = new_path
             else:
-                print(f"du: невозможно получить доступ к '{target_path}': Нет такого файла или каталога")
-        
-        # Новая команда tree для показа древовидной структуры
-        elif command == "tree":
-            if not args:
-                target_path = self.vfs.current_vfs_path
+                print(f"cd: {target_path}: Не каталог")
+    
+    def _cmd_cat(self, args):
+        """Команда cat - чтение файлов из VFS"""
+        if not args:
+            print("cat: отсутствует операнд")
+            return
+        
+        # Собираем вывод по всем файлам и печатаем его одной операцией записи
+        out = []
+        for file_path in args:
+            _, node = self.vfs.resolve_and_lookup(file_path)
+            content = self.vfs.read_node(node)
+            if content is not None:
+                out.append(content)
             else:
-                target_path = self.vfs.resolve_path(args[0])
-            
-            tree_structure = self.vfs.get_tree_structure(target_path)
-            if tree_structure is not None:
-                print(tree_structure)
+                out.append(f"cat: {file_path}: Нет такого файла или каталога")
+        sys.stdout.write("\n".join(out) + "\n")
+    
+    def _cmd_pwd(self, args):
+        """Команда pwd - показ текущего пути в VFS"""
+        print(self.vfs.current_vfs_path)
+    
+    def _cmd_echo(self, args):
+        """Команда echo для демонстрации работы с аргументами"""
+        print(f"echo: {' '.join(args)}")
+    
+    def _cmd_wc(self, args):
+        """Команда wc - подсчет строк, слов и байтов"""
+        if not args:
+            print("wc: отсутствует операнд")
+            return
+        
+        for file_path in args:
+            _, node = self.vfs.resolve_and_lookup(file_path)
+            line_count, word_count, byte_count = self.vfs.count_node_stats(node)
+            if line_count is not None:
+                print(f"  {line_count}  {word_count}  {byte_count} {file_path}")
             else:
-                print(f"tree: {target_path} [ошибка открытия каталога]")
+                print(f"wc: {file_path}: Нет такого файла или каталога")
+    
+    def _cmd_du(self, args):
+        """Команда du - размер файлов и директорий"""
+        if not args:
+            # Если аргументов нет, показываем размер текущей директории
+            target_path = self.vfs.current_vfs_path
+            node = self.vfs.get_node(target_path)
+        else:
+            target_path, node = self.vfs.resolve_and_lookup(args[0])
         
-        # Новая команда cp для копирования файлов
-        elif command == "cp":
-            if len(args) != 2:
-                print("cp: требуется два аргумента: исходный_файл целевой_файл")
-                return
-            
-            src_path = self.vfs.resolve_path(args[0])
-            dst_path = self.vfs.resolve_path(args[1])
-            
-            success, message = self.vfs.copy_file(src_path, dst_path)
-            if not success:
-                print(f"cp: {message}")
+        size = self.vfs.get_node_size(node)
+        if size is not None:
+            print(f"{size}\t{target_path}")
+        else:
+            print(f"du: невозможно получить доступ к '{target_path}': Нет такого файла или каталога")
+    
+    def _cmd_tree(self, args):
+        """Команда tree - древовидная структура директории"""
+        if not args:
+            target_path = self.vfs.current_vfs_path
+            node = self.vfs.get_node(target_path)
+        else:
+            target_path, node = self.vfs.resolve_and_lookup(args[0])
         
-        # Обрабатываем неизвестные команды
-        elif command:
-            print(f"Команда '{command}' не найдена")
+        tree_structure = self.vfs.get_node_tree(node, target_path)
+        if tree_structure is not None:
+            # Дерево уже собрано целиком - выводим его одной операцией записи
+            sys.stdout.write(tree_structure + "\n")
+        else:
+            print(f"tree: {target_path} [ошибка открытия каталога]")
+    
+    def _cmd_cp(self, args):
+        """Команда cp - копирование файлов"""
+        if len(args) != 2:
+            print("cp: требуется два аргумента: исходный_файл целевой_файл")
+            return
+        
+        src_path = self.vfs.resolve_path(args[0])
+        dst_path = self.vfs.resolve_path(args[1])
+        
+        success, message = self.vfs.copy_file(src_path, dst_path)
+        if not success:
+            print(f"cp: {message}")
 
     def run_script(self, script_path):
         """
@@ -547,22 +708,53 @@ class ShellEmulator:
             script_path (str): Путь к файлу скрипта
         """
         
-        # Проверяем существует ли файл скрипта
-        if not os.path.exists(script_path):
+        # Разбираем скрипт (или берем уже разобранный из кэша).
+        # Отдельная проверка существования не нужна: ее заменяет обработка FileNotFoundError
+        try:
+            compiled = self._compile_script(script_path)
+        except FileNotFoundError:
             print(f"Ошибка: скрипт '{script_path}' не найден")
             return  # Выходим из функции если файл не существует
+        except Exception as e:
+            print(f"Ошибка при выполнении скрипта: {e}")
+            return
         
         # Сообщаем о начале выполнения скрипта
         print(f"\nВЫПОЛНЕНИЕ СКРИПТА: {script_path}")
         
         try:
-            # Открываем файл скрипта для чтения с кодировкой UTF-8
-            with open(script_path, 'r', encoding='utf-8') as file:
-                # Читаем все строки файла в список
-                lines = file.readlines()
+            self._execute_compiled(compiled)
+            
+            # Сообщаем о завершении выполнения скрипта
+            print("ВЫПОЛНЕНИЕ СКРИПТА ЗАВЕРШЕНО")
             
-            # Проходим по всем строкам скрипта, нумеруя их начиная с 1
-            for line_num, line in enumerate(lines, 1):
+        except Exception as e:
+            # Обрабатываем любые исключения при выполнении скрипта
+            print(f"Ошибка при выполнении скрипта: {e}")
+    
+    def _compile_script(self, script_path):
+        """
+        Читает и заранее разбирает все строки скрипта.
+        Результат кэшируется по пути, времени изменения и размеру файла, поэтому
+        повторный запуск неизмененного скрипта не разбирает его заново
+        
+        Returns:
+            list: кортежи (line_num, line, command, args, error), где error -
+                  текст ошибки парсинга или None
+        """
+        
+        # Открываем файл скрипта для чтения с кодировкой UTF-8 и берем метаданные
+        # у уже открытого файла, без отдельного обращения к пути
+        with open(script_path, 'r', encoding='utf-8') as file:
+            stat = os.fstat(file.fileno())
+            key = (script_path, stat.st_mtime, stat.st_size)
+            compiled = self._script_cache.get(key)
+            if compiled is not None:
+                return compiled
+            
+            compiled = []
+            # Нумеруем строки начиная с 1
+            for line_num, line in enumerate(file, 1):
                 # Убираем пробельные символы в начале и конце строки
                 line = line.strip()
                 
@@ -570,29 +762,41 @@ class ShellEmulator:
                 if not line or line.startswith('#'):
                     continue  # Переходим к следующей строке
                 
-                # Имитируем интерактивный ввод: показываем приглашение и команду
-                prompt = self.get_prompt()  # Получаем текущее приглашение
-                print(f"{prompt}{line}")  # Выводим как будто пользователь ввел эту команду
-                
-                # Парсим команду из строки скрипта
-                command, args = self.parse_command(line)
-                
-                # Если команда распаршена успешно - выполняем ее
-                if command:
-                    self.execute_command(command, args)
-                else:
-                    # Если произошла ошибка парсинга - сообщаем и пропускаем строку
-                    print(f"Строка {line_num}: ошибка парсинга - пропускаем")
+                # Парсим команду из строки скрипта; ошибку сохраняем, чтобы
+                # сообщить о ней в момент выполнения этой строки
+                try:
+                    command, args = self._split_command(line)
+                    error = None
+                except ValueError as e:
+                    command, args, error = None, [], str(e)
                 
-                # Печатаем пустую строку для визуального разделения команд
-                print()
+                compiled.append((line_num, line, command, args, error))
+        
+        self._script_cache[key] = compiled
+        return compiled
+    
+    def _execute_compiled(self, compiled):
+        """
+        Выполняет заранее разобранные строки скрипта
+        """
+        
+        for line_num, line, command, args, error in compiled:
+            # Имитируем интерактивный ввод: показываем приглашение и команду
+            prompt = self.get_prompt()  # Получаем текущее приглашение
+            print(f"{prompt}{line}")  # Выводим как будто пользователь ввел эту команду
             
-            # Сообщаем о завершении выполнения скрипта
-            print("ВЫПОЛНЕНИЕ СКРИПТА ЗАВЕРШЕНО")
+            if error is not None:
+                print(f"Ошибка парсинга: {error}")
             
-        except Exception as e:
-            # Обрабатываем любые исключения при работе с файлом скрипта
-            print(f"Ошибка при выполнении скрипта: {e}")
+            # Если команда распаршена успешно - выполняем ее
+            if command:
+                self.execute_command(command, args)
+            else:
+                # Если произошла ошибка парсинга - сообщаем и пропускаем строку
+                print(f"Строка {line_num}: ошибка парсинга - пропускаем")
+            
+            # Печатаем пустую строку для визуального разделения команд
+            print()
     
     def run(self):
         """